@@ -4,12 +4,15 @@ Authentication routes for user registration and login.
 
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from typing import Optional
+import asyncio
+import logging
 import sqlite3
-import traceback
-from database import db
-from auth import get_password_hash, verify_password, create_access_token, verify_token
+from database import db, user_by_email_cache, user_caches_lock, user_caches_generation, cache_user_lookup
+from auth import get_password_hash_async, verify_password_async, create_access_token, verify_token
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 security = HTTPBearer()
@@ -21,14 +24,18 @@ class RegisterRequest(BaseModel):
     password: str = Field(..., min_length=6, description="User password (min 6 characters)")
     name: Optional[str] = Field(None, description="User name")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        extra="forbid",
+        str_strip_whitespace=False,
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "email": "user@example.com",
                 "password": "password123",
                 "name": "John Doe"
             }
         }
+    )
 
 
 class LoginRequest(BaseModel):
@@ -36,13 +43,17 @@ class LoginRequest(BaseModel):
     email: EmailStr = Field(..., description="User email address")
     password: str = Field(..., description="User password")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        extra="forbid",
+        str_strip_whitespace=False,
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "email": "user@example.com",
                 "password": "password123"
             }
         }
+    )
 
 
 class AuthResponse(BaseModel):
@@ -52,8 +63,9 @@ class AuthResponse(BaseModel):
     name: Optional[str] = Field(None, description="User name")
     token: str = Field(..., description="JWT access token")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "user_id": 1,
                 "email": "user@example.com",
@@ -61,49 +73,102 @@ class AuthResponse(BaseModel):
                 "token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9..."
             }
         }
+    )
+
+
+# Served by the index backing the UNIQUE constraint on users.email
+GET_USER_BY_EMAIL_SQL = """
+    SELECT id, email, password_hash, name, expo_push_token
+    FROM users
+    WHERE email = ?
+"""
+
+GET_USER_BY_ID_SQL = """
+    SELECT id, email, name, expo_push_token
+    FROM users
+    WHERE id = ?
+"""
 
 
 def get_user_by_email(email: str) -> Optional[dict]:
     """Get user by email from database."""
+    with user_caches_lock:
+        user = user_by_email_cache.get(email)
+    if user is not None:
+        return user
+    
     try:
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, email, password_hash, name, expo_push_token
-                FROM users
-                WHERE email = ?
-            """, (email,))
-            row = cursor.fetchone()
-            if row:
-                return dict(row)
-            return None
+        generation = user_caches_generation()
+        with db.get_read_connection() as conn:
+            row = conn.execute(GET_USER_BY_EMAIL_SQL, (email,)).fetchone()
+        if row:
+            user = dict(row)
+            cache_user_lookup(user_by_email_cache, email, user, generation)
+            return user
+        return None
     except Exception as e:
-        print(f"Error getting user by email: {e}")
+        logger.error("Error getting user by email: %s", e)
         return None
 
 
 def create_user(email: str, password_hash: str, name: Optional[str] = None) -> Optional[int]:
-    """Create a new user in the database."""
+    """
+    Create a new user in the database.
+    
+    Raises:
+        sqlite3.IntegrityError: If the email is already registered
+    """
+    name = name or email.partition('@')[0]
     try:
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
+        with db.get_write_connection() as conn:
+            user_id = conn.execute("""
                 INSERT INTO users (email, password_hash, name)
                 VALUES (?, ?, ?)
-            """, (email, password_hash, name or email.split('@')[0]))
-            conn.commit()
-            return cursor.lastrowid
-    except sqlite3.IntegrityError as e:
-        # Email already exists
-        print(f"Integrity error creating user: {e}")
-        return None
-    except Exception as e:
-        import traceback
-        print(f"Error creating user: {e}")
-        traceback.print_exc()
+                RETURNING id
+            """, (email, password_hash, name)).fetchone()[0]
+        # Prime the cache once the insert is committed so the first login
+        # skips the lookup query
+        with user_caches_lock:
+            user_by_email_cache[email] = {
+                "id": user_id,
+                "email": email,
+                "password_hash": password_hash,
+                "name": name,
+                "expo_push_token": None
+            }
+        return user_id
+    except sqlite3.IntegrityError:
+        # Email already exists; let the caller map it to a 400
+        raise
+    except Exception:
+        logger.exception("Error creating user")
         return None
 
 
+def get_user_by_id(user_id: int) -> Optional[dict]:
+    """Get a user's public fields by ID from database."""
+    with db.get_read_connection() as conn:
+        row = conn.execute(GET_USER_BY_ID_SQL, (user_id,)).fetchone()
+        return dict(row) if row else None
+
+
+# Async wrappers for the route handlers below, as in database.py
+
+async def get_user_by_email_async(email: str) -> Optional[dict]:
+    """Run get_user_by_email in a worker thread."""
+    return await asyncio.to_thread(get_user_by_email, email)
+
+
+async def create_user_async(email: str, password_hash: str, name: Optional[str] = None) -> Optional[int]:
+    """Run create_user in a worker thread."""
+    return await asyncio.to_thread(create_user, email, password_hash, name)
+
+
+async def get_user_by_id_async(user_id: int) -> Optional[dict]:
+    """Run get_user_by_id in a worker thread."""
+    return await asyncio.to_thread(get_user_by_id, user_id)
+
+
 @router.post("/register", response_model=AuthResponse)
 async def register(request: RegisterRequest):
     """
@@ -116,28 +181,19 @@ async def register(request: RegisterRequest):
         AuthResponse with user_id, email, name, and JWT token
     """
     try:
-        # Check if user already exists
-        existing_user = get_user_by_email(request.email)
-        if existing_user:
+        # Hash password
+        password_hash = await get_password_hash_async(request.password)
+        
+        # Create user; the UNIQUE constraint on email rejects duplicates
+        try:
+            user_id = await create_user_async(request.email, password_hash, request.name)
+        except sqlite3.IntegrityError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
         
-        # Hash password
-        password_hash = get_password_hash(request.password)
-        
-        # Create user
-        user_id = create_user(request.email, password_hash, request.name)
-        
         if not user_id:
-            # Check if it failed due to duplicate email (race condition)
-            existing_user = get_user_by_email(request.email)
-            if existing_user:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Email already registered"
-                )
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create user. Please try again."
@@ -155,8 +211,7 @@ async def register(request: RegisterRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Unexpected error in register: {e}")
-        traceback.print_exc()
+        logger.exception("Unexpected error in register")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Internal server error: {str(e)}"
@@ -175,7 +230,7 @@ async def login(request: LoginRequest):
         AuthResponse with user_id, email, name, and JWT token
     """
     # Get user from database
-    user = get_user_by_email(request.email)
+    user = await get_user_by_email_async(request.email)
     
     if not user:
         raise HTTPException(
@@ -184,7 +239,7 @@ async def login(request: LoginRequest):
         )
     
     # Verify password
-    if not verify_password(request.password, user["password_hash"]):
+    if not await verify_password_async(request.password, user["password_hash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -239,27 +294,19 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     
     # Get user from database
     try:
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, email, name, expo_push_token
-                FROM users
-                WHERE id = ?
-            """, (user_id_int,))
-            row = cursor.fetchone()
-            if row:
-                return dict(row)
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-    except HTTPException:
-        raise
+        user = await get_user_by_id_async(user_id_int)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error fetching user: {str(e)}"
         )
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
 
 
 def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> int:
@@ -316,7 +363,7 @@ def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(secu
         raise
     except Exception as e:
         # Catch any unexpected errors and convert to HTTPException
-        print(f"Unexpected error in get_current_user_id: {e}")
+        logger.error("Unexpected error in get_current_user_id: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Authentication error"
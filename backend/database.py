@@ -3,55 +3,145 @@ Database connection and configuration module.
 Handles database initialization and connection management.
 """
 
+import asyncio
+import json
+import logging
+import queue
 import sqlite3
-from typing import Optional, List, Dict, Any, Tuple
+import threading
+from typing import Optional, List, Dict, Any, Tuple, Union
 from contextlib import contextmanager
-from datetime import datetime
+from datetime import datetime, timezone
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
 
 
 class Database:
     """Database connection manager for SQLite."""
     
-    def __init__(self, db_path: str = "thelocalshield.db"):
+    def __init__(self, db_path: str = "thelocalshield.db", pool_size: int = 5):
         """
         Initialize database connection.
         
         Args:
             db_path: Path to SQLite database file
+            pool_size: Number of pooled read connections
         """
         self.db_path = db_path
-        self.connection: Optional[sqlite3.Connection] = None
-        self.initialize_tables()
+        self.pool_size = pool_size
+        # SQLite allows one writer at a time, so all writes share a single
+        # connection behind a lock while reads are spread over a pool of
+        # connections that WAL lets run concurrently with the writer.
+        # The write lock is deliberately not re-entrant: a nested
+        # get_write_connection() can't open a second transaction.
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.Lock()
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=pool_size)
+        # Every open reader, including ones checked out of the queue, so
+        # disconnect() can close them all
+        self._all_readers: List[sqlite3.Connection] = []
+        self._pool_lock = threading.Lock()
+        self._pragmas_applied = False
+    
+    def _open_connection(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a new tuned connection to the database file."""
+        # Autocommit mode: sqlite3 never opens implicit transactions; writes
+        # are wrapped in explicit ones by get_write_connection()
+        connection = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256
+        )
+        connection.row_factory = sqlite3.Row  # Enable column access by name
+        
+        # journal_mode is persisted in the database file, so it only needs
+        # to be set once. WAL lets readers proceed during writes and needs
+        # one fsync per commit (at checkpoint) instead of two.
+        # page_size must come first: it only takes effect on a new, empty
+        # database and can't be changed once the file is in WAL mode.
+        if not self._pragmas_applied:
+            connection.execute("PRAGMA page_size=4096")  # Match the OS page size
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._pragmas_applied = True
+        
+        # The remaining PRAGMAs are per-connection settings
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute("PRAGMA temp_store=MEMORY")
+        connection.execute("PRAGMA cache_size=-64000")  # ~64 MB
+        # Reads of warm pages come straight from the memory map instead of a
+        # pread() into the page cache. 32-bit processes have too little
+        # address space for this and should cap it much lower.
+        connection.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+        connection.execute("PRAGMA busy_timeout=5000")
+        if read_only:
+            connection.execute("PRAGMA query_only=ON")
+        return connection
     
     def connect(self):
-        """Establish database connection."""
-        if self.connection is None:
-            self.connection = sqlite3.connect(self.db_path)
-            self.connection.row_factory = sqlite3.Row  # Enable column access by name
-        return self.connection
+        """Open the writer and reader connections if not already open."""
+        with self._pool_lock:
+            if self._writer is None:
+                # The writer is opened first so it applies journal_mode=WAL
+                self._writer = self._open_connection()
+                for _ in range(self.pool_size):
+                    reader = self._open_connection(read_only=True)
+                    self._all_readers.append(reader)
+                    self._readers.put_nowait(reader)
+        return self._writer
     
     def disconnect(self):
-        """Close database connection."""
-        if self.connection:
-            self.connection.close()
-            self.connection = None
+        """Close all database connections."""
+        with self._pool_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            for reader in self._all_readers:
+                reader.close()
+            self._all_readers.clear()
+            # Readers still checked out go back to the old queue, which is
+            # dropped, so a later connect() starts from an empty one
+            self._readers = queue.Queue(maxsize=self.pool_size)
     
     @contextmanager
-    def get_connection(self):
+    def get_write_connection(self):
         """
-        Context manager for database connections.
-        Ensures proper connection handling and cleanup.
+        Context manager for the single writer connection.
+        Holds the write lock and runs the block in one transaction,
+        committed on success or rolled back on error.
+        """
+        with self._write_lock:
+            conn = self.connect()
+            # IMMEDIATE takes the write lock up front rather than upgrading
+            # a deferred read transaction on the first write, which is
+            # where SQLITE_BUSY shows up under concurrent readers
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+    
+    # Callers that don't distinguish reads from writes get the writer
+    get_connection = get_write_connection
+    
+    @contextmanager
+    def get_read_connection(self):
         """
-        conn = self.connect()
+        Context manager for read-only queries.
+        Checks a connection out of the reader pool and returns it afterwards;
+        blocks while all readers are in use.
+        """
+        self.connect()
+        readers = self._readers
+        conn = readers.get()
         try:
             yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
         finally:
-            # Don't close the persistent connection, just commit/rollback
-            pass
+            readers.put(conn)
     
     def initialize_tables(self):
         """Initialize database tables if they don't exist."""
@@ -82,6 +172,15 @@ class Database:
                 )
             """)
             
+            # last_updated is stored as ISO 8601 UTC with a Z suffix. Rows
+            # written before that hold the server's local time with no zone,
+            # so convert them once.
+            cursor.execute("""
+                UPDATE locations
+                SET last_updated = strftime('%Y-%m-%dT%H:%M:%SZ', last_updated, 'utc')
+                WHERE last_updated NOT LIKE '%Z'
+            """)
+            
             # Create emergencies table for POC polling
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS emergencies (
@@ -90,11 +189,45 @@ class Database:
                     latitude REAL,
                     longitude REAL,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    created_epoch INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
                     FOREIGN KEY (user_id) REFERENCES users(id)
                 )
             """)
             
-            conn.commit()
+            # Databases created before created_epoch existed: add the column
+            # and backfill it from created_at. ALTER TABLE can't add an
+            # expression default, so CREATE_EMERGENCY_SQL still sets it.
+            columns = [row['name'] for row in cursor.execute("PRAGMA table_info(emergencies)")]
+            if 'created_epoch' not in columns:
+                cursor.execute("ALTER TABLE emergencies ADD COLUMN created_epoch INTEGER")
+                cursor.execute("""
+                    UPDATE emergencies
+                    SET created_epoch = CAST(strftime('%s', created_at) AS INTEGER)
+                """)
+            
+            # Push tokens Expo accepted for each emergency broadcast
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS emergency_recipients (
+                    emergency_id INTEGER,
+                    token TEXT,
+                    sent_at TIMESTAMP,
+                    FOREIGN KEY (emergency_id) REFERENCES emergencies(id)
+                )
+            """)
+            
+            # Covering index for the /emergency/recent polling queries:
+            # rows come back newest-first without a sort or table lookup
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_emergencies_epoch
+                ON emergencies(created_epoch DESC, user_id, id, latitude, longitude, created_at)
+            """)
+            
+            # Partial index over users that can receive push notifications
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_users_token
+                ON users(expo_push_token)
+                WHERE expo_push_token IS NOT NULL AND expo_push_token != ''
+            """)
     
     def execute_query(self, query: str, params: tuple = None):
         """Execute a database query."""
@@ -108,10 +241,106 @@ class Database:
     
     def execute_many(self, query: str, params_list: list):
         """Execute a query multiple times with different parameters."""
+        # get_connection() runs all rows in a single transaction
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.executemany(query, params_list)
-            conn.commit()
+
+
+# Short-lived caches for user rows that rarely change between requests.
+# Any write to the users table must go through invalidate_user_caches().
+# TTLCache is not thread-safe, so all access goes through user_caches_lock.
+user_by_email_cache: TTLCache = TTLCache(maxsize=4096, ttl=60)
+# A single (user_id, token) list shared by every sender; each caller
+# filters itself out, so memory stays linear in the number of users
+push_tokens_cache: TTLCache = TTLCache(maxsize=1, ttl=30)
+user_caches_lock = threading.Lock()
+# Bumped on every invalidation. A reader takes it before querying and only
+# caches its result if it is unchanged, so a query that raced a write
+# can't put rows from before the commit back into a cache.
+_user_caches_generation = 0
+
+
+# Hot-path SQL is kept in module-level constants so every call passes the
+# identical text and hits sqlite3's per-connection prepared-statement cache
+GET_PUSH_TOKENS_SQL = """
+    SELECT id, expo_push_token
+    FROM users
+    WHERE expo_push_token IS NOT NULL AND expo_push_token != ''
+"""
+
+# Updates the existing row in place on conflict, unlike INSERT OR REPLACE
+# which deletes it and inserts a new one. The timestamp is taken by SQLite,
+# as ISO 8601 UTC with an explicit zone so clients parse it unambiguously.
+UPSERT_LOCATION_SQL = """
+    INSERT INTO locations (user_id, latitude, longitude, last_updated)
+    VALUES (?, ?, ?, strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))
+    ON CONFLICT(user_id) DO UPDATE SET
+        latitude = excluded.latitude,
+        longitude = excluded.longitude,
+        last_updated = excluded.last_updated
+"""
+
+GET_PUSH_TOKENS_BY_USER_IDS_SQL = """
+    SELECT id, expo_push_token
+    FROM users
+    WHERE id IN (SELECT value FROM json_each(?))
+      AND expo_push_token IS NOT NULL AND expo_push_token != ''
+"""
+
+REGISTER_PUSH_TOKEN_SQL = """
+    UPDATE users 
+    SET expo_push_token = ?, name = COALESCE(?, name)
+    WHERE id = ?
+"""
+
+CREATE_EMERGENCY_SQL = """
+    INSERT INTO emergencies (user_id, latitude, longitude, created_epoch)
+    VALUES (?, ?, ?, CAST(strftime('%s', 'now') AS INTEGER))
+"""
+
+CREATE_EMERGENCY_RECIPIENT_SQL = """
+    INSERT INTO emergency_recipients (emergency_id, token, sent_at)
+    VALUES (?, ?, CURRENT_TIMESTAMP)
+"""
+
+# One statement for every combination of filters. The created_epoch range
+# is always present (bound to -1 when unfiltered) so SQLite can search the
+# index instead of scanning it; an unset user filter is bound as NULL and
+# short-circuits, and LIMIT -1 means no limit
+RECENT_EMERGENCIES_SQL = """
+    SELECT id, user_id, latitude, longitude, created_at
+    FROM emergencies
+    WHERE created_epoch > :since
+      AND (:exclude_user_id IS NULL OR user_id != :exclude_user_id)
+    ORDER BY created_epoch DESC
+    LIMIT :limit
+"""
+
+
+def invalidate_user_caches():
+    """Drop all cached user lookups after a users table mutation."""
+    global _user_caches_generation
+    with user_caches_lock:
+        _user_caches_generation += 1
+        user_by_email_cache.clear()
+        push_tokens_cache.clear()
+
+
+def user_caches_generation() -> int:
+    """Current cache generation; read it before running a cacheable query."""
+    with user_caches_lock:
+        return _user_caches_generation
+
+
+def cache_user_lookup(cache: TTLCache, key: Any, value: Any, generation: int):
+    """
+    Store a user lookup unless the caches were invalidated since generation
+    was read, in which case value may predate the last write.
+    """
+    with user_caches_lock:
+        if generation == _user_caches_generation:
+            cache[key] = value
 
 
 def get_all_users() -> List[Dict[str, Any]]:
@@ -121,32 +350,55 @@ def get_all_users() -> List[Dict[str, Any]]:
     Returns:
         List of dictionaries containing user data (id, name, expo_push_token)
     """
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name, expo_push_token FROM users")
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+    with db.get_read_connection() as conn:
+        cursor = conn.execute("SELECT id, name, expo_push_token FROM users")
+        return [dict(row) for row in cursor]
 
 
-def get_user_push_tokens_except(user_id: int) -> List[str]:
+def get_user_push_tokens_except(user_id: int, skip_cache: bool = False) -> List[str]:
     """
     Get push tokens for all users except the specified user.
+    Results are cached for a short time unless skip_cache is set.
     
     Args:
         user_id: User ID to exclude from results
+        skip_cache: Always query the database (the fresh result is still cached)
         
     Returns:
         List of Expo push tokens (excluding None/empty tokens)
     """
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT expo_push_token 
-            FROM users 
-            WHERE id != ? AND expo_push_token IS NOT NULL AND expo_push_token != ''
-        """, (user_id,))
-        rows = cursor.fetchall()
-        return [row['expo_push_token'] for row in rows if row['expo_push_token']]
+    rows = None
+    if not skip_cache:
+        with user_caches_lock:
+            rows = push_tokens_cache.get(None)
+    
+    if rows is None:
+        generation = user_caches_generation()
+        with db.get_read_connection() as conn:
+            rows = [(row[0], row[1]) for row in conn.execute(GET_PUSH_TOKENS_SQL)]
+        cache_user_lookup(push_tokens_cache, None, rows, generation)
+    
+    return [token for token_user_id, token in rows if token_user_id != user_id]
+
+
+def get_push_tokens_by_user_ids(user_ids: List[int]) -> Dict[int, str]:
+    """
+    Get the push tokens of specific users.
+    
+    Args:
+        user_ids: User IDs to look up
+        
+    Returns:
+        Dictionary mapping user ID to Expo push token, for users that have one
+    """
+    if not user_ids:
+        return {}
+    
+    with db.get_read_connection() as conn:
+        # The IDs are passed as one JSON array so the statement text (and
+        # its cached prepared statement) doesn't depend on the list length
+        cursor = conn.execute(GET_PUSH_TOKENS_BY_USER_IDS_SQL, (json.dumps(user_ids),))
+        return {row['id']: row['expo_push_token'] for row in cursor}
 
 
 def upsert_location(user_id: int, latitude: float, longitude: float) -> bool:
@@ -162,19 +414,12 @@ def upsert_location(user_id: int, latitude: float, longitude: float) -> bool:
         bool: True if successful, False otherwise
     """
     try:
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            current_timestamp = datetime.now().isoformat()
-            
-            # Use INSERT OR REPLACE for upsert operation
-            cursor.execute("""
-                INSERT OR REPLACE INTO locations (user_id, latitude, longitude, last_updated)
-                VALUES (?, ?, ?, ?)
-            """, (user_id, latitude, longitude, current_timestamp))
+        with db.get_write_connection() as conn:
+            conn.execute(UPSERT_LOCATION_SQL, (user_id, latitude, longitude))
             
             return True
     except Exception as e:
-        print(f"Error upserting location: {e}")
+        logger.error("Error upserting location: %s", e)
         return False
 
 
@@ -185,14 +430,12 @@ def get_all_locations() -> List[Dict[str, Any]]:
     Returns:
         List of dictionaries containing location data (user_id, latitude, longitude, last_updated)
     """
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
+    with db.get_read_connection() as conn:
+        cursor = conn.execute("""
             SELECT user_id, latitude, longitude, last_updated 
             FROM locations
         """)
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        return [dict(row) for row in cursor]
 
 
 def create_emergency(user_id: int, latitude: float, longitude: float) -> int:
@@ -208,110 +451,92 @@ def create_emergency(user_id: int, latitude: float, longitude: float) -> int:
         int: Emergency ID
     """
     try:
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO emergencies (user_id, latitude, longitude)
-                VALUES (?, ?, ?)
-            """, (user_id, latitude, longitude))
+        with db.get_write_connection() as conn:
+            cursor = conn.execute(CREATE_EMERGENCY_SQL, (user_id, latitude, longitude))
             return cursor.lastrowid
     except Exception as e:
-        print(f"Error creating emergency: {e}")
+        logger.error("Error creating emergency: %s", e)
         return -1
 
 
-def get_recent_emergencies(since_timestamp: str = None, exclude_user_id: int = None) -> List[Dict[str, Any]]:
+def create_emergency_recipients(emergency_id: int, token_list: List[str]) -> bool:
+    """
+    Record the push tokens an emergency broadcast was sent to.
+    
+    Args:
+        emergency_id: Emergency identifier
+        token_list: Expo push tokens the notification was sent to
+        
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    if not token_list:
+        return True
+    try:
+        with db.get_write_connection() as conn:
+            # One transaction (and one commit) for all recipients
+            conn.executemany(
+                CREATE_EMERGENCY_RECIPIENT_SQL,
+                [(emergency_id, token) for token in token_list]
+            )
+            return True
+    except Exception as e:
+        logger.error("Error recording emergency recipients: %s", e)
+        return False
+
+
+def to_epoch(timestamp: Union[str, int]) -> int:
+    """
+    Convert an ISO 8601 timestamp or unix epoch to integer epoch seconds.
+    Timestamps without a UTC offset are taken as UTC, like SQLite's own.
+    
+    Raises:
+        ValueError: If timestamp is neither, or is out of SQLite's integer range
+    """
+    if isinstance(timestamp, int) or timestamp.isdecimal():
+        epoch = int(timestamp)
+        if epoch >= 2 ** 63:
+            raise ValueError(f"Epoch out of range: {timestamp}")
+        return epoch
+    if timestamp.endswith('Z'):
+        timestamp = timestamp[:-1] + '+00:00'
+    parsed = datetime.fromisoformat(timestamp)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def get_recent_emergencies(since_timestamp: Union[str, int] = None, exclude_user_id: int = None) -> List[Dict[str, Any]]:
     """
     Get recent emergency events.
     
     Args:
-        since_timestamp: Only return emergencies after this timestamp (ISO format)
+        since_timestamp: Only return emergencies after this timestamp (ISO format or unix epoch)
         exclude_user_id: Exclude emergencies from this user
         
     Returns:
         List of emergency dictionaries
     """
     try:
-        # Ensure table exists
-        db.initialize_tables()
-        
-        # Convert ISO timestamp to SQLite format if provided
-        if since_timestamp:
-            # Remove 'Z' suffix and replace 'T' with space for SQLite comparison
-            since_timestamp = since_timestamp.replace('Z', '').replace('T', ' ')
-            # Also handle milliseconds - SQLite stores without them
-            if '.' in since_timestamp:
-                since_timestamp = since_timestamp.split('.')[0]
+        since_epoch = to_epoch(since_timestamp) if since_timestamp else None
         
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
+        with db.get_read_connection() as conn:
+            # Without any filter only the latest 50 are returned
+            logger.debug("Query: created_epoch > %s AND user_id != %s", since_epoch, exclude_user_id)
+            cursor = conn.execute(RECENT_EMERGENCIES_SQL, {
+                "since": -1 if since_epoch is None else since_epoch,
+                "exclude_user_id": exclude_user_id,
+                "limit": 50 if since_epoch is None and exclude_user_id is None else -1
+            })
             
-            # Handle None values properly
-            if since_timestamp and exclude_user_id is not None:
-                print(f"🔍 Query: created_at > '{since_timestamp}' AND user_id != {exclude_user_id}")
-                cursor.execute("""
-                    SELECT id, user_id, latitude, longitude, created_at
-                    FROM emergencies
-                    WHERE created_at > ? AND user_id != ?
-                    ORDER BY created_at DESC
-                """, (since_timestamp, exclude_user_id))
-            elif since_timestamp:
-                print(f"🔍 Query: created_at > '{since_timestamp}'")
-                cursor.execute("""
-                    SELECT id, user_id, latitude, longitude, created_at
-                    FROM emergencies
-                    WHERE created_at > ?
-                    ORDER BY created_at DESC
-                """, (since_timestamp,))
-            elif exclude_user_id is not None:
-                print(f"🔍 Query: user_id != {exclude_user_id}")
-                cursor.execute("""
-                    SELECT id, user_id, latitude, longitude, created_at
-                    FROM emergencies
-                    WHERE user_id != ?
-                    ORDER BY created_at DESC
-                """, (exclude_user_id,))
-            else:
-                print("🔍 Query: ALL emergencies (last 50)")
-                cursor.execute("""
-                    SELECT id, user_id, latitude, longitude, created_at
-                    FROM emergencies
-                    ORDER BY created_at DESC
-                    LIMIT 50
-                """)
-            
-            rows = cursor.fetchall()
-            print(f"📊 Found {len(rows) if rows else 0} rows")
-            
-            # CRITICAL: Always return a list, never None
-            if rows is None:
-                return []
-            if not rows:
-                return []
+            # Build the result straight from the cursor; created_at is
+            # stored as TEXT so rows need no further conversion
+            result = [dict(row) for row in cursor]
             
-            # Convert rows to dictionaries with proper formatting
-            result = []
-            for row in rows:
-                if row:
-                    row_dict = dict(row)
-                    # Ensure created_at is a string (ISO format)
-                    if 'created_at' in row_dict and row_dict['created_at']:
-                        if isinstance(row_dict['created_at'], str):
-                            pass  # Already a string
-                        else:
-                            # Convert datetime to ISO string
-                            row_dict['created_at'] = row_dict['created_at'].isoformat()
-                    # Ensure all required fields are present
-                    if all(key in row_dict for key in ['id', 'user_id', 'latitude', 'longitude', 'created_at']):
-                        result.append(row_dict)
-            
-            print(f"✅ Returning {len(result)} emergencies")
-            # Final safety check - ensure we return a list
-            return result if isinstance(result, list) else []
-    except Exception as e:
-        print(f"Error in get_recent_emergencies: {e}")
-        import traceback
-        traceback.print_exc()
+            logger.debug("Returning %d emergencies", len(result))
+            return result
+    except Exception:
+        logger.exception("Error in get_recent_emergencies")
         # Return empty list on error instead of crashing
         return []
 
@@ -330,36 +555,67 @@ def register_push_token(user_id: int, expo_push_token: str, name: str = None) ->
         bool: True if successful, False otherwise
     """
     try:
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Check if user exists
-            cursor.execute("SELECT id FROM users WHERE id = ?", (user_id,))
-            user_exists = cursor.fetchone()
-            
-            if user_exists:
-                # Update existing user's push token and optionally name
-                if name:
-                    cursor.execute("""
-                        UPDATE users 
-                        SET expo_push_token = ?, name = ?
-                        WHERE id = ?
-                    """, (expo_push_token, name, user_id))
-                else:
-                    cursor.execute("""
-                        UPDATE users 
-                        SET expo_push_token = ?
-                        WHERE id = ?
-                    """, (expo_push_token, user_id))
-                return True
-            else:
-                print(f"User {user_id} does not exist. Cannot register push token.")
-                return False
+        with db.get_write_connection() as conn:
+            # A single UPDATE both checks the user exists (via rowcount)
+            # and keeps the current name when none is given
+            cursor = conn.execute(REGISTER_PUSH_TOKEN_SQL, (expo_push_token, name or None, user_id))
+            updated = cursor.rowcount == 1
+        if updated:
+            # After COMMIT, so readers that start now see the new token;
+            # readers that queried earlier see the generation change and
+            # don't cache their result
+            invalidate_user_caches()
+            return True
+        logger.warning("User %s does not exist. Cannot register push token.", user_id)
+        return False
     except Exception as e:
-        print(f"Error registering push token: {e}")
+        logger.error("Error registering push token: %s", e)
         return False
 
 
+# Async wrappers for use from async route handlers. sqlite3 calls block,
+# so they run on the default thread pool to keep the event loop free.
+
+async def upsert_location_async(user_id: int, latitude: float, longitude: float) -> bool:
+    """Run upsert_location in a worker thread."""
+    return await asyncio.to_thread(upsert_location, user_id, latitude, longitude)
+
+
+async def get_all_locations_async() -> List[Dict[str, Any]]:
+    """Run get_all_locations in a worker thread."""
+    return await asyncio.to_thread(get_all_locations)
+
+
+async def create_emergency_async(user_id: int, latitude: float, longitude: float) -> int:
+    """Run create_emergency in a worker thread."""
+    return await asyncio.to_thread(create_emergency, user_id, latitude, longitude)
+
+
+async def create_emergency_recipients_async(emergency_id: int, token_list: List[str]) -> bool:
+    """Run create_emergency_recipients in a worker thread."""
+    return await asyncio.to_thread(create_emergency_recipients, emergency_id, token_list)
+
+
+async def get_user_push_tokens_except_async(user_id: int, skip_cache: bool = False) -> List[str]:
+    """Run get_user_push_tokens_except in a worker thread."""
+    return await asyncio.to_thread(get_user_push_tokens_except, user_id, skip_cache)
+
+
+async def get_push_tokens_by_user_ids_async(user_ids: List[int]) -> Dict[int, str]:
+    """Run get_push_tokens_by_user_ids in a worker thread."""
+    return await asyncio.to_thread(get_push_tokens_by_user_ids, user_ids)
+
+
+async def get_recent_emergencies_async(since_timestamp: Union[str, int] = None, exclude_user_id: int = None) -> List[Dict[str, Any]]:
+    """Run get_recent_emergencies in a worker thread."""
+    return await asyncio.to_thread(get_recent_emergencies, since_timestamp, exclude_user_id)
+
+
+async def register_push_token_async(user_id: int, expo_push_token: str, name: str = None) -> bool:
+    """Run register_push_token in a worker thread."""
+    return await asyncio.to_thread(register_push_token, user_id, expo_push_token, name)
+
+
 # Global database instance
 db = Database()
 
@@ -3,18 +3,35 @@ Emergency-related API routes.
 Handles emergency requests and responses.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Request
+from fastapi.responses import Response
 from typing import List, Optional, Dict, Any
-from models import EmergencyRequest, EmergencyResponse, NotifyNearbyRequest, EmergencyEvent
-from database import db, upsert_location, get_user_push_tokens_except, get_recent_emergencies, create_emergency
+import logging
+import orjson
+from models import EmergencyRequest, EmergencyResponse, EmergencyEvent, NotifyNearbyRequest
+from database import (
+    db, upsert_location_async, get_user_push_tokens_except_async, get_recent_emergencies_async,
+    create_emergency_async, create_emergency_recipients_async, to_epoch
+)
 from auth_routes import get_current_user_id
+from openapi_examples import (
+    EMERGENCY_REQUEST, EMERGENCY_RESPONSE, EMERGENCY_EVENT, NOTIFY_NEARBY_REQUEST,
+    request_example, response_example
+)
 from push_notifications import push_service
 
+logger = logging.getLogger(__name__)
+
 # Initialize router
 router = APIRouter()
 
 
-@router.post("/request", response_model=EmergencyResponse)
+@router.post(
+    "/request",
+    response_model=EmergencyResponse,
+    openapi_extra=request_example(EMERGENCY_REQUEST),
+    responses=response_example(EMERGENCY_RESPONSE)
+)
 async def create_emergency_request(request: EmergencyRequest):
     """
     Create a new emergency request.
@@ -29,7 +46,7 @@ async def create_emergency_request(request: EmergencyRequest):
 
 
 # IMPORTANT: /recent must come BEFORE /{emergency_id} to avoid route collision
-@router.get("/recent")
+@router.get("/recent", response_model=List[EmergencyEvent], responses=response_example([EMERGENCY_EVENT]))
 async def get_recent_emergencies_endpoint(
     request: Request,
     since: Optional[str] = None
@@ -38,69 +55,49 @@ async def get_recent_emergencies_endpoint(
     Get recent emergency events (for POC polling).
     
     Args:
-        since: ISO timestamp - only return emergencies after this time
+        since: ISO timestamp or unix epoch - only return emergencies after this time
         
     Returns:
         List of recent emergency events (always a list, never None)
     """
-    print(f"🔍 /recent called with since={since}")
-    result = []
+    logger.debug("/recent called with since=%s", since)
     
-    try:
-        # Try to get user_id from token
-        exclude_id = None
+    since_epoch = None
+    if since:
         try:
-            auth_header = request.headers.get("authorization", "")
-            if auth_header and auth_header.startswith("Bearer "):
-                token = auth_header[7:]
-                try:
-                    from auth_routes import verify_token
-                    user_data = verify_token(token)
-                    if user_data and isinstance(user_data, dict):
-                        exclude_id = user_data.get("user_id")
-                        print(f"🔑 Authenticated user_id: {exclude_id}")
-                except Exception as e:
-                    print(f"⚠️ Token verification failed: {e}")
-        except Exception as e:
-            print(f"⚠️ Auth header extraction failed: {e}")
-        
-        # Get emergencies from database
-        try:
-            emergencies = get_recent_emergencies(since, exclude_id)
-            print(f"📊 Database returned {len(emergencies) if emergencies else 0} emergencies")
-            print(f"📋 Raw emergencies: {emergencies}")
-            
-            if emergencies and isinstance(emergencies, list):
-                for emergency in emergencies:
-                    if emergency and isinstance(emergency, dict):
-                        try:
-                            validated = {
-                                'id': int(emergency.get('id', 0)),
-                                'user_id': int(emergency.get('user_id', 0)),
-                                'latitude': float(emergency.get('latitude', 0.0)),
-                                'longitude': float(emergency.get('longitude', 0.0)),
-                                'created_at': str(emergency.get('created_at', ''))
-                            }
-                            if validated['id'] > 0 and validated['user_id'] > 0:
-                                result.append(validated)
-                                print(f"✅ Added emergency: {validated}")
-                        except Exception as e:
-                            print(f"❌ Failed to validate emergency: {e}")
-                            continue
-        except Exception as e:
-            print(f"❌ Database error: {e}")
-            import traceback
-            traceback.print_exc()
-    
+            since_epoch = to_epoch(since)
+        except ValueError:
+            raise HTTPException(
+                status_code=422,
+                detail="Invalid since: expected an ISO 8601 timestamp or unix epoch seconds"
+            )
+    
+    # Try to get user_id from token
+    exclude_id = None
+    try:
+        auth_header = request.headers.get("authorization", "")
+        if auth_header and auth_header.startswith("Bearer "):
+            token = auth_header[7:]
+            try:
+                from auth_routes import verify_token
+                user_data = verify_token(token)
+                if user_data and isinstance(user_data, dict):
+                    exclude_id = user_data.get("user_id")
+                    logger.debug("Authenticated user_id: %s", exclude_id)
+            except Exception as e:
+                logger.debug("Token verification failed: %s", e)
     except Exception as e:
-        print(f"❌ Critical error in endpoint: {e}")
-        import traceback
-        traceback.print_exc()
-    
-    print(f"🎯 Returning {len(result)} emergencies: {result}")
-    return result
+        logger.debug("Auth header extraction failed: %s", e)
+    
+    # Rows come straight from the emergencies table and already match
+    # EmergencyEvent, so they are encoded with orjson as-is instead of being
+    # re-validated through the response_model (kept for the OpenAPI docs).
+    # On error get_recent_emergencies returns an empty list.
+    emergencies = await get_recent_emergencies_async(since_epoch, exclude_id)
+    logger.debug("Returning %d emergencies", len(emergencies))
+    return Response(orjson.dumps(emergencies), media_type="application/json")
 
-@router.get("/{emergency_id}", response_model=EmergencyResponse)
+@router.get("/{emergency_id}", response_model=EmergencyResponse, responses=response_example(EMERGENCY_RESPONSE))
 async def get_emergency(emergency_id: str):
     """
     Retrieve emergency request details.
@@ -114,7 +111,7 @@ async def get_emergency(emergency_id: str):
     pass
 
 
-@router.get("/user/{user_id}", response_model=List[EmergencyResponse])
+@router.get("/user/{user_id}", response_model=List[EmergencyResponse], responses=response_example([EMERGENCY_RESPONSE]))
 async def get_user_emergencies(
     user_id: str,
     limit: Optional[int] = 50,
@@ -166,44 +163,75 @@ async def cancel_emergency(emergency_id: str):
     pass
 
 
-@router.post("/notify_nearby")
+async def _broadcast_push(emergency_id: int, push_tokens: List[str], title: str, body: str):
+    """
+    Send an emergency push notification to every token and record the
+    recipients Expo accepted.
+    Runs as a background task after the notify_nearby response is sent.
+    
+    Args:
+        emergency_id: Emergency identifier (-1 if it could not be stored)
+        push_tokens: Expo push tokens to notify
+        title: Notification title
+        body: Notification message body
+    """
+    statuses = await push_service.send_push_batch(push_tokens, title, body)
+    sent_tokens = [token for token, sent in zip(push_tokens, statuses) if sent]
+    logger.info("Emergency %s broadcast sent to %d of %d recipients", emergency_id, len(sent_tokens), len(push_tokens))
+    
+    if emergency_id > 0:
+        await create_emergency_recipients_async(emergency_id, sent_tokens)
+
+
+@router.post("/notify_nearby", openapi_extra=request_example(NOTIFY_NEARBY_REQUEST))
 async def notify_nearby(
+    background_tasks: BackgroundTasks,
     request: NotifyNearbyRequest,
     current_user_id: int = Depends(get_current_user_id)
 ):
     """
     Notify nearby users about an emergency.
+    The push notifications are sent in the background after responding.
     
     Args:
-        request: Notify nearby request with user_id, latitude, and longitude
+        background_tasks: FastAPI background task queue
+        request: Notify nearby request with latitude and longitude
         
     Returns:
-        dict: Status and number of recipients notified
+        dict: Status and number of recipients the notification was queued for
     """
+    latitude = request["latitude"]
+    longitude = request["longitude"]
+    
     # Use authenticated user_id instead of request.user_id
     user_id = current_user_id
     
-    # 1. Upsert location for sender
-    upsert_location(user_id, request.latitude, request.longitude)
+    # 1. Query all other users' Expo push tokens
+    push_tokens = await get_user_push_tokens_except_async(user_id)
     
-    # 2. Create emergency event in database (for POC polling)
-    emergency_id = create_emergency(user_id, request.latitude, request.longitude)
+    # 2. Upsert location for sender
+    await upsert_location_async(user_id, latitude, longitude)
     
-    # 3. Query all other users' Expo push tokens
-    push_tokens = get_user_push_tokens_except(user_id)
+    # 3. Create emergency event in database. Always stored, even with no
+    # push recipients, because clients also discover emergencies by polling
+    emergency_id = await create_emergency_async(user_id, latitude, longitude)
     
-    # 4. For each token, send a push notification (if available)
-    title = "Emergency Alert"
-    body = f"A nearby user is in an emergency. Location: {request.latitude}, {request.longitude}"
+    if not push_tokens:
+        return {
+            "status": "no-recipients",
+            "queued": False,
+            "recipients": 0,
+            "emergency_id": emergency_id
+        }
     
-    sent_count = 0
-    for token in push_tokens:
-        success = await push_service.send_push(token, title, body)
-        if success:
-            sent_count += 1
+    # 4. Queue the broadcast so the caller doesn't wait on Expo
+    title = "Emergency Alert"
+    body = f"A nearby user is in an emergency. Location: {latitude}, {longitude}"
+    background_tasks.add_task(_broadcast_push, emergency_id, push_tokens, title, body)
     
     return {
         "status": "sent",
-        "recipients": sent_count,
+        "queued": True,
+        "recipients": len(push_tokens),
         "emergency_id": emergency_id
-    }
\ No newline at end of file
+    }
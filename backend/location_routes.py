@@ -6,14 +6,18 @@ Handles location tracking and retrieval endpoints.
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Optional
 from models import LocationModel, LocationUpdateRequest, LocationResponse, RegisterPushTokenRequest
-from database import db, upsert_location, get_all_locations, register_push_token
+from database import db, upsert_location_async, get_all_locations_async, register_push_token_async
 from auth_routes import get_current_user_id
+from openapi_examples import (
+    LOCATION_MODEL, LOCATION_UPDATE_REQUEST, LOCATION_RESPONSE, REGISTER_PUSH_TOKEN_REQUEST,
+    request_example, response_example
+)
 
 # Initialize router
 router = APIRouter()
 
 
-@router.post("/track", response_model=dict)
+@router.post("/track", response_model=dict, openapi_extra=request_example(LOCATION_MODEL))
 async def track_location(location: LocationModel):
     """
     Track and store a user's location.
@@ -27,7 +31,7 @@ async def track_location(location: LocationModel):
     pass
 
 
-@router.get("/history/{user_id}", response_model=List[LocationModel])
+@router.get("/history/{user_id}", response_model=List[LocationModel], responses=response_example([LOCATION_MODEL]))
 async def get_location_history(
     user_id: str,
     limit: Optional[int] = 100,
@@ -47,7 +51,7 @@ async def get_location_history(
     pass
 
 
-@router.get("/current/{user_id}", response_model=LocationModel)
+@router.get("/current/{user_id}", response_model=LocationModel, responses=response_example(LOCATION_MODEL))
 async def get_current_location(user_id: str):
     """
     Get the most recent location for a user.
@@ -75,7 +79,7 @@ async def clear_location_history(user_id: str):
     pass
 
 
-@router.post("/update")
+@router.post("/update", openapi_extra=request_example(LOCATION_UPDATE_REQUEST))
 async def update_location(
     request: LocationUpdateRequest,
     current_user_id: int = Depends(get_current_user_id)
@@ -84,13 +88,13 @@ async def update_location(
     Update a user's location.
     
     Args:
-        request: Location update request with user_id, latitude, and longitude
+        request: Location update request with latitude and longitude
         
     Returns:
         dict: Success message
     """
     # Use authenticated user_id instead of request.user_id
-    success = upsert_location(current_user_id, request.latitude, request.longitude)
+    success = await upsert_location_async(current_user_id, request["latitude"], request["longitude"])
     
     if success:
         return {"status": "success", "message": "Location updated successfully"}
@@ -98,7 +102,7 @@ async def update_location(
         raise HTTPException(status_code=500, detail="Failed to update location")
 
 
-@router.get("/all", response_model=List[LocationResponse])
+@router.get("/all", response_model=List[LocationResponse], responses=response_example([LOCATION_RESPONSE]))
 async def get_all_locations_endpoint():
     """
     Get all location records.
@@ -106,11 +110,11 @@ async def get_all_locations_endpoint():
     Returns:
         List of location records with user_id, latitude, longitude, and last_updated
     """
-    locations = get_all_locations()
+    locations = await get_all_locations_async()
     return locations
 
 
-@router.post("/register_token")
+@router.post("/register_token", openapi_extra=request_example(REGISTER_PUSH_TOKEN_REQUEST))
 async def register_token(
     request: RegisterPushTokenRequest,
     current_user_id: int = Depends(get_current_user_id)
@@ -119,13 +123,13 @@ async def register_token(
     Register or update a user's Expo push token.
     
     Args:
-        request: Push token registration request with user_id and expo_push_token
+        request: Push token registration request with expo_push_token and optional name
         
     Returns:
         dict: Success message
     """
     # Use authenticated user_id instead of request.user_id
-    success = register_push_token(current_user_id, request.expo_push_token, request.name)
+    success = await register_push_token_async(current_user_id, request["expo_push_token"], request.get("name"))
     
     if success:
         return {"status": "success", "message": "Push token registered successfully"}
@@ -3,10 +3,14 @@ FastAPI main application entry point.
 Initializes the FastAPI app and includes all route routers.
 """
 
+import logging
+import logging.handlers
+import queue
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from database import db
+from push_notifications import push_service
 
 # Import routers
 from location_routes import router as location_router
@@ -14,22 +18,48 @@ from emergency_routes import router as emergency_router
 from auth_routes import router as auth_router
 
 
+# Request handlers only enqueue log records; a background listener thread
+# formats them and does the (possibly blocking) stream writes
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+log_listener = logging.handlers.QueueListener(log_queue, log_handler)
+queue_handler = logging.handlers.QueueHandler(log_queue)
+queue_handler.setFormatter(logging.Formatter("%(message)s"))  # Final layout is applied by log_handler
+logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+# httpx logs every request at INFO, i.e. one line per Expo batch POST
+logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("httpcore").setLevel(logging.WARNING)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Lifespan context manager for startup and shutdown events.
     """
+    # Startup: Begin draining the log queue
+    log_listener.start()
+    
     # Startup: Initialize database
     print("Initializing database...")
     db.initialize_tables()
     print("Database initialized successfully")
     
+    # Startup: Open pooled push notification connections
+    await push_service.startup()
+    
     yield
     
     # Shutdown: Close database connection
     print("Closing database connection...")
     db.disconnect()
     print("Database connection closed")
+    
+    # Shutdown: Close pooled push notification connections
+    await push_service.shutdown()
+    
+    # Shutdown: Flush any queued log records
+    log_listener.stop()
 
 
 # Initialize FastAPI application
@@ -70,9 +100,9 @@ async def health_check():
 @app.get("/test/emergencies")
 async def test_emergencies():
     """Test endpoint to check if emergencies table works."""
-    from database import get_recent_emergencies
+    from database import get_recent_emergencies_async
     try:
-        emergencies = get_recent_emergencies()
+        emergencies = await get_recent_emergencies_async()
         return {
             "status": "ok",
             "count": len(emergencies),
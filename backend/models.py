@@ -3,8 +3,9 @@ Pydantic models for request/response validation.
 Defines data structures for API endpoints.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
+from typing_extensions import Annotated, NotRequired, TypedDict
 from datetime import datetime
 
 
@@ -15,15 +16,7 @@ class LocationModel(BaseModel):
     timestamp: Optional[datetime] = Field(None, description="Location timestamp")
     accuracy: Optional[float] = Field(None, description="Location accuracy in meters")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "latitude": 40.7128,
-                "longitude": -74.0060,
-                "timestamp": "2024-01-01T12:00:00",
-                "accuracy": 10.5
-            }
-        }
+    model_config = ConfigDict(defer_build=True)
 
 
 class EmergencyRequest(BaseModel):
@@ -34,18 +27,7 @@ class EmergencyRequest(BaseModel):
     description: Optional[str] = Field(None, description="Emergency description")
     timestamp: Optional[datetime] = Field(None, description="Emergency timestamp")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "user_id": "user123",
-                "location": {
-                    "latitude": 40.7128,
-                    "longitude": -74.0060
-                },
-                "emergency_type": "medical",
-                "description": "Need immediate medical assistance"
-            }
-        }
+    model_config = ConfigDict(defer_build=True)
 
 
 class EmergencyResponse(BaseModel):
@@ -55,15 +37,7 @@ class EmergencyResponse(BaseModel):
     created_at: datetime = Field(..., description="Emergency creation timestamp")
     message: Optional[str] = Field(None, description="Response message")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "emergency_id": "emergency123",
-                "status": "active",
-                "created_at": "2024-01-01T12:00:00",
-                "message": "Emergency request received"
-            }
-        }
+    model_config = ConfigDict(defer_build=True)
 
 
 class PushNotificationRequest(BaseModel):
@@ -73,76 +47,40 @@ class PushNotificationRequest(BaseModel):
     body: str = Field(..., description="Notification body")
     data: Optional[dict] = Field(None, description="Additional notification data")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "user_id": "user123",
-                "title": "Emergency Alert",
-                "body": "Emergency assistance is on the way",
-                "data": {"emergency_id": "emergency123"}
-            }
-        }
-
-
-class NotifyNearbyRequest(BaseModel):
-    """Model for notify nearby emergency request."""
-    latitude: float = Field(..., description="Latitude coordinate")
-    longitude: float = Field(..., description="Longitude coordinate")
+    model_config = ConfigDict(defer_build=True)
+
+
+# Plain wire records are TypedDicts, which FastAPI validates directly as
+# request bodies, so handlers get dicts instead of model instances.
+# Unknown keys (e.g. a legacy user_id) are ignored.
+
+class NotifyNearbyRequest(TypedDict):
+    """Notify nearby emergency request."""
+    latitude: Annotated[float, Field(description="Latitude coordinate")]
+    longitude: Annotated[float, Field(description="Longitude coordinate")]
     # user_id is now obtained from JWT token, not from request
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "latitude": 40.7128,
-                "longitude": -74.0060
-            }
-        }
 
 
-class LocationUpdateRequest(BaseModel):
-    """Model for location update request."""
-    latitude: float = Field(..., description="Latitude coordinate")
-    longitude: float = Field(..., description="Longitude coordinate")
+class LocationUpdateRequest(TypedDict):
+    """Location update request."""
+    latitude: Annotated[float, Field(description="Latitude coordinate")]
+    longitude: Annotated[float, Field(description="Longitude coordinate")]
     # user_id is now obtained from JWT token, not from request
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "latitude": 40.7128,
-                "longitude": -74.0060
-            }
-        }
-
-
-class LocationResponse(BaseModel):
-    """Model for location response data."""
-    user_id: int = Field(..., description="User identifier")
-    latitude: float = Field(..., description="Latitude coordinate")
-    longitude: float = Field(..., description="Longitude coordinate")
-    last_updated: str = Field(..., description="Last updated timestamp")
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "user_id": 1,
-                "latitude": 40.7128,
-                "longitude": -74.0060,
-                "last_updated": "2024-01-01T12:00:00"
-            }
-        }
-
-
-class RegisterPushTokenRequest(BaseModel):
-    """Model for push token registration request."""
-    expo_push_token: str = Field(..., description="Expo push notification token")
+
+
+class LocationResponse(TypedDict):
+    """Location response data."""
+    user_id: Annotated[int, Field(description="User identifier")]
+    latitude: Annotated[float, Field(description="Latitude coordinate")]
+    longitude: Annotated[float, Field(description="Longitude coordinate")]
+    last_updated: Annotated[str, Field(description="Last updated timestamp (ISO 8601, UTC)")]
+
+
+class RegisterPushTokenRequest(TypedDict):
+    """Push token registration request."""
+    expo_push_token: Annotated[str, Field(description="Expo push notification token")]
+    name: NotRequired[Annotated[Optional[str], Field(description="User name")]]
     # user_id is now obtained from JWT token, not from request
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "expo_push_token": "ExponentPushToken[xxxxx]"
-            }
-        }
 
 
 class EmergencyEvent(BaseModel):
@@ -153,14 +91,5 @@ class EmergencyEvent(BaseModel):
     longitude: float = Field(..., description="Longitude coordinate")
     created_at: str = Field(..., description="Emergency creation timestamp (ISO format)")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "id": 1,
-                "user_id": 2,
-                "latitude": 40.7128,
-                "longitude": -74.0060,
-                "created_at": "2024-01-01T12:00:00"
-            }
-        }
+    model_config = ConfigDict(defer_build=True)
 
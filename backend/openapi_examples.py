@@ -0,0 +1,70 @@
+"""
+Example payloads for the OpenAPI docs.
+Kept out of the pydantic models so they don't become part of the
+validation schemas; routes attach them via openapi_extra / responses.
+"""
+
+from typing import Any, Dict
+
+LOCATION_MODEL: Dict[str, Any] = {
+    "latitude": 40.7128,
+    "longitude": -74.0060,
+    "timestamp": "2024-01-01T12:00:00",
+    "accuracy": 10.5
+}
+
+EMERGENCY_REQUEST: Dict[str, Any] = {
+    "user_id": "user123",
+    "location": {
+        "latitude": 40.7128,
+        "longitude": -74.0060
+    },
+    "emergency_type": "medical",
+    "description": "Need immediate medical assistance"
+}
+
+EMERGENCY_RESPONSE: Dict[str, Any] = {
+    "emergency_id": "emergency123",
+    "status": "active",
+    "created_at": "2024-01-01T12:00:00",
+    "message": "Emergency request received"
+}
+
+NOTIFY_NEARBY_REQUEST: Dict[str, Any] = {
+    "latitude": 40.7128,
+    "longitude": -74.0060
+}
+
+LOCATION_UPDATE_REQUEST: Dict[str, Any] = {
+    "latitude": 40.7128,
+    "longitude": -74.0060
+}
+
+LOCATION_RESPONSE: Dict[str, Any] = {
+    "user_id": 1,
+    "latitude": 40.7128,
+    "longitude": -74.0060,
+    "last_updated": "2024-01-01T12:00:00Z"
+}
+
+REGISTER_PUSH_TOKEN_REQUEST: Dict[str, Any] = {
+    "expo_push_token": "ExponentPushToken[xxxxx]"
+}
+
+EMERGENCY_EVENT: Dict[str, Any] = {
+    "id": 1,
+    "user_id": 2,
+    "latitude": 40.7128,
+    "longitude": -74.0060,
+    "created_at": "2024-01-01T12:00:00"
+}
+
+
+def request_example(example: Dict[str, Any]) -> Dict[str, Any]:
+    """Build an openapi_extra dict documenting a JSON request body example."""
+    return {"requestBody": {"content": {"application/json": {"example": example}}}}
+
+
+def response_example(example: Any) -> Dict[int, Dict[str, Any]]:
+    """Build a responses dict documenting a 200 JSON response example."""
+    return {200: {"content": {"application/json": {"example": example}}}}
@@ -3,9 +3,26 @@ Push notification service module.
 Handles sending push notifications to users.
 """
 
+import asyncio
+import logging
 import httpx
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from models import PushNotificationRequest
+from database import get_push_tokens_by_user_ids_async
+
+logger = logging.getLogger(__name__)
+
+# Expo Push Notification API endpoint
+EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+
+# Maximum number of messages Expo accepts in one request
+EXPO_BATCH_SIZE = 100
+
+EXPO_HEADERS = {
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+    "Content-Type": "application/json"
+}
 
 
 class PushNotificationService:
@@ -15,6 +32,30 @@ class PushNotificationService:
         """Initialize push notification service."""
         self.api_key: Optional[str] = None
         self.api_url: Optional[str] = None
+        # One pooled HTTP/2 client shared by every send, so pushes reuse open
+        # TLS connections to Expo instead of handshaking per request
+        self._client: Optional[httpx.AsyncClient] = None
+    
+    async def startup(self):
+        """Open the shared HTTP client. Called on application startup."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                timeout=httpx.Timeout(5.0),
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+            )
+    
+    async def shutdown(self):
+        """Close the shared HTTP client. Called on application shutdown."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, opening it if startup() hasn't run."""
+        if self._client is None or self._client.is_closed:
+            await self.startup()
+        return self._client
     
     def configure(self, api_key: str, api_url: str):
         """
@@ -48,7 +89,28 @@ class PushNotificationService:
         Returns:
             Dictionary mapping user_id to success status
         """
-        pass
+        results = {request.user_id: False for request in requests}
+        
+        user_ids = [int(user_id) for user_id in results if user_id.isdecimal()]
+        tokens = await get_push_tokens_by_user_ids_async(user_ids)
+        
+        # Users without a registered token are reported as failed
+        messages: List[Dict[str, Any]] = []
+        recipients: List[str] = []
+        for request in requests:
+            token = tokens.get(int(request.user_id)) if request.user_id.isdecimal() else None
+            if not token:
+                continue
+            message = {"to": token, "sound": "default", "title": request.title, "body": request.body}
+            if request.data:
+                message["data"] = request.data
+            messages.append(message)
+            recipients.append(request.user_id)
+        
+        if messages:
+            for user_id, sent in zip(recipients, await self._send_messages(messages)):
+                results[user_id] = sent
+        return results
     
     async def register_device_token(self, user_id: str, device_token: str) -> bool:
         """
@@ -89,9 +151,6 @@ class PushNotificationService:
             bool: True if notification sent successfully, False otherwise
         """
         try:
-            # Expo Push Notification API endpoint
-            expo_api_url = "https://exp.host/--/api/v2/push/send"
-            
             # Prepare the notification payload
             payload = {
                 "to": expo_token,
@@ -101,27 +160,100 @@ class PushNotificationService:
             }
             
             # Send the notification using httpx
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    expo_api_url,
-                    json=payload,
-                    headers={
-                        "Accept": "application/json",
-                        "Accept-Encoding": "gzip, deflate",
-                        "Content-Type": "application/json"
-                    }
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    # Expo returns a data array with status for each notification
-                    if isinstance(result, dict) and result.get("data"):
-                        return result["data"][0].get("status") == "ok"
-                    return True
-                return False
+            client = await self._get_client()
+            response = await client.post(
+                EXPO_PUSH_URL,
+                json=payload,
+                headers=EXPO_HEADERS
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                # Expo returns a data array with status for each notification
+                if isinstance(result, dict) and result.get("data"):
+                    return result["data"][0].get("status") == "ok"
+                return True
+            return False
         except Exception as e:
-            print(f"Error sending push notification: {e}")
+            logger.error("Error sending push notification: %s", e)
             return False
+    
+    async def _send_push_chunk(self, client: httpx.AsyncClient, messages: List[Dict[str, Any]]) -> List[bool]:
+        """
+        Send one batch of messages to Expo.
+        
+        Args:
+            client: HTTP client to send the request with
+            messages: Up to EXPO_BATCH_SIZE Expo message payloads
+            
+        Returns:
+            List of per-message success flags, aligned with messages
+        """
+        response = await client.post(EXPO_PUSH_URL, json=messages, headers=EXPO_HEADERS)
+        if response.status_code != 200:
+            return [False] * len(messages)
+        result = response.json()
+        # Expo returns one ticket per message, in request order
+        tickets = result.get("data") if isinstance(result, dict) else None
+        if not isinstance(tickets, list):
+            return [False] * len(messages)
+        statuses = [isinstance(ticket, dict) and ticket.get("status") == "ok" for ticket in tickets]
+        statuses.extend([False] * (len(messages) - len(statuses)))
+        return statuses[:len(messages)]
+    
+    async def _send_messages(self, messages: List[Dict[str, Any]]) -> List[bool]:
+        """
+        Send Expo messages in batches of EXPO_BATCH_SIZE, concurrently.
+        
+        Args:
+            messages: Expo message payloads
+            
+        Returns:
+            List of per-message success flags, aligned with messages
+        """
+        chunks = [
+            messages[i:i + EXPO_BATCH_SIZE]
+            for i in range(0, len(messages), EXPO_BATCH_SIZE)
+        ]
+        
+        client = await self._get_client()
+        results = await asyncio.gather(
+            *(self._send_push_chunk(client, chunk) for chunk in chunks),
+            return_exceptions=True
+        )
+        
+        statuses: List[bool] = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, Exception):
+                logger.error("Error sending push notification batch: %s", result)
+                statuses.extend([False] * len(chunk))
+            else:
+                statuses.extend(result)
+        return statuses
+    
+    async def send_push_batch(self, expo_tokens: List[str], title: str, body: str) -> List[bool]:
+        """
+        Send the same push notification to many Expo push tokens.
+        Tokens are grouped into batches of EXPO_BATCH_SIZE and the batches
+        are sent concurrently.
+        
+        Args:
+            expo_tokens: Expo push tokens
+            title: Notification title
+            body: Notification message body
+            
+        Returns:
+            List of per-token success flags (Expo returned an "ok" ticket),
+            aligned with expo_tokens
+        """
+        if not expo_tokens:
+            return []
+        
+        messages = [
+            {"to": token, "sound": "default", "title": title, "body": body}
+            for token in expo_tokens
+        ]
+        return await self._send_messages(messages)
 
 
 # Global push notification service instance